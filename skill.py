@@ -1,9 +1,16 @@
 """A skill for opsdroid that integrates with HubSpot."""
 import aiohttp
+import asyncio
 import json
 import logging
+import time
 
-from voluptuous import Required
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+from voluptuous import Optional, Required
 
 from opsdroid.skill import Skill
 from opsdroid import events
@@ -17,9 +24,52 @@ from opsdroid.connector.github.events import (
 
 _LOGGER = logging.getLogger(__name__)
 CONFIG_SCHEMA = {
-    Required("token"): str
+    Required("token"): str,
+    Optional("github_token"): str,
 }
 HUBSPOT_API_URL= "https://api.hubapi.com/crm/v3/"
+GITHUB_USER_CACHE_TTL = 3600
+GITHUB_USER_CACHE_SIZE = 1024
+GITHUB_TO_HUBSPOT_FIELDS = (
+    ("email", "email"),
+    ("blog", "website"),
+    ("company", "company"),
+)
+ASSOCIATION_BATCH_DELAY = 0.05
+ASSOCIATION_BATCH_SIZE = 100
+ASSOCIATION_RETRY_CONCURRENCY = 4
+
+
+def _dumps(data):
+    """Serialize ``data`` to JSON bytes, using ``orjson`` when available."""
+    if orjson is not None:
+        return orjson.dumps(data)
+    return json.dumps(data).encode("utf-8")
+
+
+def _loads(data):
+    """Deserialize JSON bytes, using ``orjson`` when available.
+
+    Callers should check for an empty body first, unlike ``resp.json()`` this
+    raises instead of returning ``None``.
+
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _created_associations(resp):
+    """Return the ``(ticket_id, contact_id)`` pairs HubSpot reports as created."""
+    created = set()
+    for result in (resp or {}).get("results", []):
+        from_id = str(result.get("from", {}).get("id"))
+        targets = result.get("to", [])
+        if isinstance(targets, dict):
+            targets = [targets]
+        for target in targets:
+            created.add((from_id, str(target.get("id"))))
+    return created
 
 
 class HubspotSkill(Skill):
@@ -28,8 +78,161 @@ class HubspotSkill(Skill):
     def __init__(self, opsdroid, config, *args, **kwargs):
         super().__init__(opsdroid, config, *args, **kwargs)
         self.token = config.get('token') 
+        self.github_token = config.get('github_token')
+        self._auth_header = {'authorization': f"Bearer {self.token}"}
         self.contacts =  {}
+        self.tickets = {}
+        self._state_loaded = False
+        self._state_lock = asyncio.Lock()
+        self._session = None
+        self._gh_session = None
+        self._gh_users = {}
+        self._creating_contacts = {}
+        self._pending_writes = set()
+        self._pending_assocs = []
+        self._assocs_full = asyncio.Event()
+        self._assocs_flush = None
+        self._assocs_flushing = set()
+
+    def _get_session(self):
+        """Return the shared HubSpot session, creating it on first use.
+
+        The session is created lazily because ``aiohttp`` expects to be
+        running inside the event loop when a ``ClientSession`` is created.
+        Keeping a single session around allows us to reuse connections to
+        the API instead of doing a new TLS handshake on every call.
+
+        """
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=32, ttl_dns_cache=300, keepalive_timeout=75),
+                headers={
+                    'accept': "application/json",
+                    'content-type': "application/json",
+                    **self._auth_header
+                }
+            )
+        return self._session
+
+    def _get_github_session(self):
+        """Return the shared GitHub session, creating it on first use.
+
+        If a ``github_token`` is set in the config it will be sent with every
+        request, which raises the GitHub rate limit from 60 to 5000 requests
+        per hour.
+
+        """
+        if self._gh_session is None or self._gh_session.closed:
+            headers = {'accept': "application/vnd.github+json"}
+            if self.github_token:
+                headers['authorization'] = f"token {self.github_token}"
+            self._gh_session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=16, ttl_dns_cache=300, keepalive_timeout=75),
+                headers=headers
+            )
+        return self._gh_session
+
+    async def close(self):
+        """Send queued associations, wait for pending writes and close the sessions.
+
+        Opsdroid doesn't give skills a teardown hook, so this should be
+        called when the skill is unloaded to release the open connections.
+
+        """
+        while self._assocs_flushing:
+            # Don't wait for the batch delay, we want to send everything now.
+            self._assocs_full.set()
+            await asyncio.gather(*self._assocs_flushing, return_exceptions=True)
+
+        if self._pending_writes:
+            await asyncio.gather(*self._pending_writes, return_exceptions=True)
+
+        for session in (self._session, self._gh_session):
+            if session is not None and not session.closed:
+                await session.close()
+        self._session = None
+        self._gh_session = None
     
+    def _write_in_background(self, coro):
+        """Run a database write without waiting for it to finish.
+
+        Nothing reads back what we write within the same event, so there's no
+        need to hold up the event handler on the database. We keep a
+        reference to every task until it's done, otherwise asyncio could
+        garbage collect it before it runs.
+
+        These writes are best-effort: opsdroid doesn't tell skills when it's
+        shutting down, so writes still pending when the database is
+        disconnected are lost unless ``close`` was awaited first. Failed
+        writes are logged.
+
+        """
+        task = asyncio.ensure_future(coro)
+        self._pending_writes.add(task)
+        task.add_done_callback(self._pending_writes.discard)
+        task.add_done_callback(self._log_write_error)
+        return task
+
+    @staticmethod
+    def _log_write_error(task):
+        """Log the error of a failed background database write."""
+        if not task.cancelled() and task.exception() is not None:
+            _LOGGER.error("Error when writing to the database", exc_info=task.exception())
+
+    async def _load_state(self):
+        """Migrate contacts and tickets to one database entry each.
+
+        Older versions of this skill kept all the contacts under ``contacts``
+        and all the tickets under ``tickets``, which meant rewriting every
+        entry whenever one of them changed. Each contact is now stored under
+        ``contact:<username>`` and each ticket under ``ticket:<title>``.
+
+        This runs once, on the first event, and moves any entries found under
+        the old keys into the new ones.
+
+        """
+        if self._state_loaded:
+            return
+
+        async with self._state_lock:
+            if self._state_loaded:
+                return
+
+            contacts = await self.opsdroid.memory.get("contacts")
+            if contacts:
+                self.contacts.update(contacts)
+                await asyncio.gather(*(
+                    self.opsdroid.memory.put(f"contact:{username}", contact)
+                    for username, contact in contacts.items()
+                ))
+                await self.opsdroid.memory.delete("contacts")
+
+            # Tickets are only read back once, when the issue is closed, so
+            # there's no point keeping the old ones in memory as well.
+            tickets = await self.opsdroid.memory.get("tickets")
+            if tickets:
+                await asyncio.gather(*(
+                    self.opsdroid.memory.put(f"ticket:{title}", ticket)
+                    for title, ticket in tickets.items()
+                ))
+                await self.opsdroid.memory.delete("tickets")
+
+            self._state_loaded = True
+
+    async def get_contact(self, username):
+        """Get a contact from the cache or the database.
+
+        Return:
+            contact information (dict) or None if we don't know the contact
+
+        """
+        contact = self.contacts.get(username)
+        if contact is None:
+            contact = await self.opsdroid.memory.get(f"contact:{username}")
+            if contact:
+                self.contacts[username] = contact
+        return contact
+
     async def query_api(self, endpoint, method="GET", **params):
         """Query a HubSpot API endpoint.
 
@@ -39,50 +242,110 @@ class HubspotSkill(Skill):
 
         Args:
             endpoint: The endpoint that comes after ``HUBSPOT_API_URL``
-            method: HTTP method to use (GET/POST)
+            method: HTTP method to use (GET/POST/PATCH/DELETE)
             **params: Parameters are specified as kwargs
-                For GET requests there will be sent as url params
-                For POST requests these will be used as the post body.
+                For GET/DELETE requests there will be sent as url params
+                For POST/PATCH requests these will be used as the post body.
 
-        """
-        url = f"{HUBSPOT_API_URL}{endpoint}?hapikey={self.token}"
-        headers = {
-            'accept': "application/json",
-            'content-type': "application/json"
-        }
-
-        response = None
-        async with aiohttp.ClientSession() as session:
-
-            if method.upper() == "GET":
-                async with session.get(url=url, headers=headers, params=params) as resp:
-                    if resp.status >= 400:
-                        _LOGGER.error("Error when calling HubSpot API - %s - %s", resp.status, await resp.text())
-                        return None
-                    else:
-                        response = await resp.json()
-
-            if method.upper() == "POST":
-                _LOGGER.info(json.dumps(params))
-                async with session.post(url=url,headers=headers, data=json.dumps(params)
-                ) as resp:
-                    if resp.status >= 400:
-                        _LOGGER.error("Error when calling HubSpot API - %s - %s", resp.status, resp)
-                        return None
-                    else:
-                        response = await resp.json()
-            
-            if method.upper() == "PATCH":
-                _LOGGER.info(json.dumps(params))
-                async with session.patch(url=url, headers=headers, data=json.dumps(params)) as resp:
-                    if resp.status >= 400:
-                        _LOGGER.error("Error when calling HubSpot API - %s - %s", resp.status, resp)
-                        return None
-                    else:
-                        response = await resp.json()
+        Return:
+            The decoded JSON response, ``True`` if the request succeeded but
+            there was no body (for example a ``204`` from a DELETE) or None if
+            the api returned an error.
+
+        Raises:
+            ValueError: If ``method`` isn't one of the supported methods.
 
+        """
+        _, response = await self._request(endpoint, method, **params)
         return response
+
+    async def _request(self, endpoint, method="GET", **params):
+        """Query a HubSpot API endpoint, returning the status and the response.
+
+        This works like ``query_api`` but also returns the response status, so
+        callers can tell why a request failed.
+
+        """
+        url = HUBSPOT_API_URL + endpoint
+        method = method.upper()
+
+        if method in ("GET", "DELETE"):
+            query, body = params, None
+        elif method in ("POST", "PATCH"):
+            query, body = None, _dumps(params)
+            if _LOGGER.isEnabledFor(logging.DEBUG):
+                _LOGGER.debug("Calling HubSpot API - %s %s - payload keys %s", method, endpoint, list(params))
+        else:
+            raise ValueError(f"Unsupported HTTP method '{method}'")
+
+        async with self._get_session().request(method, url, params=query, data=body) as resp:
+            if resp.status >= 400:
+                _LOGGER.error("Error when calling HubSpot API - %s %s - %s - %s", method, endpoint, resp.status, await resp.text())
+                return resp.status, None
+            data = await resp.read()
+            if not data:
+                return resp.status, True
+            return resp.status, _loads(data)
     
+    async def get_github_user(self, username):
+        """Get a user from the GitHub ``users`` endpoint.
+
+        Users are kept in a small LRU cache for ``GITHUB_USER_CACHE_TTL``
+        seconds, so a burst of issues from the same author only hits the api
+        once. Once an entry expires we send its ``ETag`` in ``If-None-Match``,
+        GitHub can then answer with a ``304`` and we just reuse the cached
+        response. When ``github_token`` is set these ``304`` responses don't
+        count against the rate limit either.
+
+        Args:
+            username: The username to use when querying the GitHub Api
+
+        Return:
+            user information (dict) or None if GitHub returned an error
+
+        """
+        headers = {}
+        cached = self._gh_users.get(username)
+        if cached:
+            fetched_at, etag, user_info = cached
+            if time.monotonic() - fetched_at < GITHUB_USER_CACHE_TTL:
+                self._cache_github_user(username, fetched_at, etag, user_info)
+                return user_info
+            if etag:
+                headers['if-none-match'] = etag
+
+        session = self._get_github_session()
+        async with session.get(f"https://api.github.com/users/{username}", headers=headers) as request:
+            if request.status == 304 and cached:
+                self._cache_github_user(username, time.monotonic(), cached[1], cached[2])
+                return cached[2]
+
+            if request.status >= 400:
+                _LOGGER.error("Error when calling GitHub API - %s - %s - %s", username, request.status, await request.text())
+                return None
+
+            user_info = _loads(await request.read())
+            self._cache_github_user(username, time.monotonic(), request.headers.get("ETag"), user_info)
+
+        return user_info
+
+    def _cache_github_user(self, username, fetched_at, etag, user_info):
+        """Put a GitHub user in the cache, evicting the least recently used."""
+        # Remove the old entry first so the user moves to the end of the dict.
+        self._gh_users.pop(username, None)
+        self._gh_users[username] = (fetched_at, etag, user_info)
+        if len(self._gh_users) > GITHUB_USER_CACHE_SIZE:
+            self._gh_users.pop(next(iter(self._gh_users)))
+
+    def invalidate_github_user(self, username):
+        """Remove a GitHub user from the cache.
+
+        Use this when we know the user profile changed, the next lookup will
+        then get the user from the GitHub api.
+
+        """
+        self._gh_users.pop(username, None)
+
     async def get_contact_details_from_github(self, username):
         """Call the GitHub API to get more information from user.
 
@@ -96,30 +359,35 @@ class HubspotSkill(Skill):
         Args:
             username: The username to use when querying the GitHub Api
 
+        Return:
+            contact information (dict) or None if we couldn't get the user
+            from GitHub, in which case no contact should be created
+
         """
-        async with aiohttp.ClientSession() as session:
-            request = await session.get(f"https://api.github.com/users/{username}")
-            user_info = await request.json()
-
-            contact_info = {username: {}}
-
-            if user_info["name"]:
-                name = user_info["name"].split(" ") 
-
-                # Note: 'firstname' and 'lastname' are expected by hubspot api
-                contact_info[username]["firstname"] = name[0]
-                contact_info[username]["lastname"] = name[-1] # Assuming that the user has at least two names
-            
-            if user_info["email"]:
-                contact_info[username]["email"] = user_info["email"]
-            
-            if user_info["blog"]:
-                contact_info[username]["website"] = user_info["blog"]
-            
-            if user_info["company"]:
-                contact_info[username]["company"] = user_info["company"]
-
-            return contact_info
+        user_info = await self.get_github_user(username)
+        if user_info is None:
+            return None
+
+        contact = {}
+
+        name = user_info.get("name")
+        if name:
+            first, _, rest = name.partition(" ")
+
+            # Note: 'firstname' and 'lastname' are expected by hubspot api
+            contact["firstname"] = first
+            last = rest.rpartition(" ")[2]
+            if last:
+                contact["lastname"] = last
+        else:
+            contact["firstname"] = username
+
+        for github_field, hubspot_field in GITHUB_TO_HUBSPOT_FIELDS:
+            value = user_info.get(github_field)
+            if value:
+                contact[hubspot_field] = value
+
+        return {username: contact}
 
     async def create_contact(self, username):
         """Create a contact from GitHub.
@@ -129,24 +397,26 @@ class HubspotSkill(Skill):
         we should create the contact and add it to the database.
 
         Return:
-            contact information (dict)
+            contact information (dict) or None if the contact wasn't created
 
         """
         github_contact_info = await self.get_contact_details_from_github(username)
+        if github_contact_info is None:
+            return None
+        contact = github_contact_info[username]
 
-        payload = {"properties": github_contact_info[username]}
-
-        resp = await self.query_api("objects/contacts", "POST", properties=payload["properties"])
+        resp = await self.query_api("objects/contacts", "POST", properties=contact)
+        if resp is None:
+            return None
 
         # Add hubspot_id to the contact info once we get it
-        github_contact_info[username]["hubspot_id"] = resp["id"]
+        contact["hubspot_id"] = resp["id"]
 
-        self.contacts[username] = github_contact_info[username] # this will be a dict of dicts: {username: {"first name": .., "last name": ..}}
+        self.contacts[username] = contact # this will be a dict of dicts: {username: {"first name": .., "last name": ..}}
 
-        _LOGGER.debug(f"Creating contact '{username}' - {self.contacts}")
+        _LOGGER.debug("Creating contact '%s' - %d contacts known", username, len(self.contacts))
 
-        # Put the whole list of contacts into the db.
-        await self.opsdroid.memory.put("contacts", self.contacts)
+        self._write_in_background(self.opsdroid.memory.put(f"contact:{username}", contact))
 
         return github_contact_info
     
@@ -162,18 +432,23 @@ class HubspotSkill(Skill):
         allows us to use the title to update a ticket in the HubSpot.
 
         """
-        tickets = await self.opsdroid.memory.get("tickets")
-
-        if not tickets:
-            tickets = {}
+        await self._load_state()
 
-        tickets[title] = {"id": id, "user": user}
+        # A ticket is only read back when its issue is closed, so we just keep
+        # it in memory until it's in the database, in case the issue is
+        # closed before the write finishes.
+        ticket = {"id": id, "user": user}
+        self.tickets[title] = ticket
 
-        _LOGGER.debug(f"Putting {title} into the tickets database")
+        _LOGGER.debug("Putting %s into the tickets database", title)
 
-        await self.opsdroid.memory.put("tickets", tickets)
+        task = self._write_in_background(self.opsdroid.memory.put(f"ticket:{title}", ticket))
+        task.add_done_callback(lambda _: self._forget_ticket(title, ticket))
 
-        tickets = None
+    def _forget_ticket(self, title, ticket):
+        """Remove a ticket from memory, unless it was replaced in the meantime."""
+        if self.tickets.get(title) is ticket:
+            del self.tickets[title]
 
 
     @match_event(IssueCreated)
@@ -188,24 +463,56 @@ class HubspotSkill(Skill):
         pipeline and stage.
 
         """
-        _LOGGER.debug(f"Received 'IssueCreated' event with title '{event.title}'.")
-        payload = {"properties": {"subject": event.title, "content": event.description, "hs_pipeline_stage": 1,"hs_pipeline": 0, "hs_ticket_priority": "LOW" }}
-        resp = await self.query_api("objects/tickets", "POST", properties=payload["properties"])
+        _LOGGER.debug("Received 'IssueCreated' event with title '%s'.", event.title)
+        properties = {"subject": event.title, "content": event.description, "hs_pipeline_stage": 1,"hs_pipeline": 0, "hs_ticket_priority": "LOW" }
+        # Creating the ticket and loading the contacts don't depend on each
+        # other, so we can run them at the same time.
+        resp, _ = await asyncio.gather(
+            self.query_api("objects/tickets", "POST", properties=properties),
+            self._load_state(),
+        )
+
+        if not resp:
+            _LOGGER.error("Couldn't create a ticket for '%s'.", event.title)
+            return
 
         await self.put_ticket_reference_in_db(title=event.title, user=event.user, id=resp["id"])
+        await self._associate_ticket_to_user(resp["id"], event.user)
 
-        self.contacts = await self.opsdroid.memory.get("contacts")
-        if not self.contacts:
-            self.contacts = {}
-
-        if self.contacts and event.user in self.contacts.keys():
-            await self.associate_ticket_to_contact(resp["id"], self.contacts[event.user]['hubspot_id'])
+    async def _associate_ticket_to_user(self, ticket_id, username):
+        """Associate a ticket to a GitHub user, creating the contact if needed."""
+        contact = await self.get_contact(username)
+        if contact:
+            await self.associate_ticket_to_contact(ticket_id, contact['hubspot_id'])
         else:
-            _LOGGER.debug(f"Contact '{event.user}' not found creating...")
-            contact_info = await self.create_contact(event.user)
-            _LOGGER.debug(f"Created contact {contact_info}")
+            _LOGGER.debug("Contact '%s' not found creating...", username)
+            contact_info = await self._create_contact_once(username)
+            _LOGGER.debug("Created contact %s", contact_info)
             if contact_info:
-                await self.associate_ticket_to_contact(resp["id"], contact_info[event.user]["hubspot_id"])
+                await self.associate_ticket_to_contact(ticket_id, contact_info[username]["hubspot_id"])
+
+    async def _create_contact_once(self, username):
+        """Create a contact, sharing the request with concurrent callers.
+
+        When a repository gets a burst of issues (for example when it's first
+        connected and all existing issues are sent) the same user will
+        usually show up many times. Rather than looking them up on GitHub and
+        creating a HubSpot contact for every issue, all events for that user
+        wait on the same ``create_contact`` call.
+
+        """
+        # Another event may have created the contact while we were looking it
+        # up in the database, its write to the database might not be done yet.
+        contact = self.contacts.get(username)
+        if contact is not None:
+            return {username: contact}
+
+        task = self._creating_contacts.get(username)
+        if task is None:
+            task = asyncio.ensure_future(self.create_contact(username))
+            self._creating_contacts[username] = task
+            task.add_done_callback(lambda _: self._creating_contacts.pop(username, None))
+        return await asyncio.shield(task)
 
     async def associate_ticket_to_contact(self, ticket_id, contact_id):
         """Associate ticket to contact.
@@ -217,29 +524,112 @@ class HubspotSkill(Skill):
         will allow us to get information like the user full name and email. Note that a
         user might not have the full name or email public.
 
+        Associations are not sent straight away, they are queued for up to
+        ``ASSOCIATION_BATCH_DELAY`` seconds (or until ``ASSOCIATION_BATCH_SIZE``
+        are waiting) and sent together in a single ``batch/create`` call. This
+        makes a burst of new issues cost one request instead of one per issue.
+
         Args:
             ticket_id: The id of the ticket to associate the contact with
             contact_id: The id of the contact to assiciate the ticket with
 
         """
-        payload = {
-            "inputs": [
-                {
-                    "from": {
-                        "id": str(ticket_id)
-                    },
-                    "to": {
-                        "id": str(contact_id)
-                    },
-                    "type": "ticket_to_contact"
-                } 
-            ]
-        }
-
-        resp = await self.query_api("associations/ticket/contact/batch/create", "POST", inputs=payload["inputs"])
-
-        if resp:
-            _LOGGER.debug(f"Associated contact '{contact_id}' to ticket '{ticket_id}'.")
+        association = {"from": {"id": str(ticket_id)}, "to": {"id": str(contact_id)}, "type": "ticket_to_contact"}
+
+        future = asyncio.get_running_loop().create_future()
+        self._pending_assocs.append((association, future))
+
+        if len(self._pending_assocs) >= ASSOCIATION_BATCH_SIZE:
+            self._assocs_full.set()
+        if self._assocs_flush is None:
+            self._schedule_assocs_flush()
+
+        created = await future
+
+        if created:
+            _LOGGER.debug("Associated contact '%s' to ticket '%s'.", contact_id, ticket_id)
+
+        return created
+
+    def _schedule_assocs_flush(self):
+        """Start a task that will send the queued associations."""
+        task = asyncio.ensure_future(self._flush_assocs())
+        self._assocs_flush = task
+        self._assocs_flushing.add(task)
+        task.add_done_callback(self._assocs_flushing.discard)
+
+    async def _post_associations(self, inputs):
+        """Create associations and return the pairs HubSpot reports as created.
+
+        Return:
+            the response status and the set of ``(ticket_id, contact_id)``
+            pairs that were created
+
+        """
+        status, resp = await self._request("associations/ticket/contact/batch/create", "POST", inputs=inputs)
+
+        for error in (resp or {}).get("errors", []):
+            _LOGGER.error("Error when associating ticket to contact - %s", error.get("message", error))
+
+        return status, _created_associations(resp)
+
+    async def _flush_assocs(self):
+        """Send the queued associations to HubSpot in a single request.
+
+        Each caller gets ``True`` only if HubSpot reports its association as
+        created. If HubSpot rejects the batch because of its inputs we retry
+        the associations one at a time (at most ``ASSOCIATION_RETRY_CONCURRENCY``
+        at once), so a single bad input (for example a contact that was
+        deleted in HubSpot) doesn't fail the others. Rate limits, auth and
+        server errors fail the whole batch, retrying would only make them worse.
+
+        """
+        try:
+            await asyncio.wait_for(self._assocs_full.wait(), ASSOCIATION_BATCH_DELAY)
+        except asyncio.TimeoutError:
+            pass
+
+        batch = self._pending_assocs[:ASSOCIATION_BATCH_SIZE]
+        del self._pending_assocs[:ASSOCIATION_BATCH_SIZE]
+
+        self._assocs_full.clear()
+        self._assocs_flush = None
+        if self._pending_assocs:
+            if len(self._pending_assocs) >= ASSOCIATION_BATCH_SIZE:
+                self._assocs_full.set()
+            self._schedule_assocs_flush()
+
+        try:
+            status, created = await self._post_associations([association for association, _ in batch])
+        except Exception as error:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(error)
+            return
+
+        if 400 <= status < 500 and status not in (401, 403, 429) and len(batch) > 1:
+            semaphore = asyncio.Semaphore(ASSOCIATION_RETRY_CONCURRENCY)
+
+            async def retry(association):
+                async with semaphore:
+                    return await self._post_associations([association])
+
+            results = await asyncio.gather(
+                *(retry(association) for association, _ in batch),
+                return_exceptions=True
+            )
+            for (_, future), result in zip(batch, results):
+                if future.done():
+                    continue
+                if isinstance(result, Exception):
+                    future.set_exception(result)
+                else:
+                    future.set_result(bool(result[1]))
+            return
+
+        for association, future in batch:
+            if not future.done():
+                future.set_result((association["from"]["id"], association["to"]["id"]) in created)
 
     
     @match_event(IssueClosed)
@@ -252,19 +642,20 @@ class HubspotSkill(Skill):
         a user's history with us.
 
         """
-        tickets = await self.opsdroid.memory.get("tickets")
+        await self._load_state()
 
-        ticket = tickets.pop(event.title, None)
-        _LOGGER.info(f"Got ticket from the 'db': {ticket}")
+        ticket = self.tickets.get(event.title)
+        if ticket is None:
+            ticket = await self.opsdroid.memory.get(f"ticket:{event.title}")
+        _LOGGER.info("Got ticket from the 'db': %s", ticket)
 
         if ticket:
-            payload = {"properties": {"hs_pipeline_stage": 4}}
-            resp = await self.query_api(f"objects/tickets/{ticket['id']}", "PATCH", properties=payload["properties"])
+            resp = await self.query_api(f"objects/tickets/{ticket['id']}", "PATCH", properties={"hs_pipeline_stage": 4})
 
             if resp:
                 # Update the db without the closed ticket
-                await self.opsdroid.memory.put("tickets", tickets)
-                tickets = None
+                self.tickets.pop(event.title, None)
+                self._write_in_background(self.opsdroid.memory.delete(f"ticket:{event.title}"))
 
     
     async def create_note(self):